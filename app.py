@@ -1,7 +1,12 @@
+import logging
 import streamlit as st
 import pandas as pd
+import numpy as np
 from streamlit_gsheets import GSheetsConnection 
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
 
 # 1. --- WIDE-SCREEN CONFIGURATION ---
 # This line must be the VERY FIRST Streamlit command called.
@@ -10,65 +15,156 @@ st.set_page_config(layout="wide")
 # --- CONFIGURATION FOR CLOUD DEPLOYMENT ---
 SHEET_WORKSHEET_NAME = 'Sheet1'
 # The Spreadsheet URL is loaded securely from Streamlit Secrets under [connections.gsheets]
+# An optional exported snapshot (Parquet, or CSV such as the sheet's gviz/tq?tqx=out:csv
+# export) can be set as `snapshot_url` in Streamlit Secrets to avoid Sheets API reads
+# Cap on how many options the select box renders at once
+MAX_SELECT_OPTIONS = 50
+# Text colors for the result columns, applied by column position
+COLUMN_COLORS = ['purple', 'red', 'grey', 'green', 'blue', 'orange']
 # -----------------------------------------
 
-@st.cache_data(ttl="10m")
+def read_snapshot() -> Optional[pd.DataFrame]:
+    """Reads the exported sheet snapshot if one is configured, otherwise returns None."""
+    try:
+        snapshot_url = st.secrets.get("snapshot_url")
+    except FileNotFoundError:
+        # No secrets file at all: no snapshot configured
+        return None
+    if not snapshot_url:
+        return None
+    
+    try:
+        # Check the URL path so query strings (signed URLs, ?raw=true) don't hide the suffix
+        if urlparse(snapshot_url).path.endswith('.parquet'):
+            return pd.read_parquet(snapshot_url)
+        return pd.read_csv(snapshot_url)
+    except Exception as e:
+        # An unreadable snapshot falls back to the live sheet, but leave a trace for operators
+        logger.warning("Could not read sheet snapshot from snapshot_url, falling back to Google Sheets: %s", e)
+        return None
+
+@st.cache_resource
+def get_connection() -> GSheetsConnection:
+    """Creates the Google Sheets connection once and reuses it across cache refreshes."""
+    return st.connection("gsheets", type=GSheetsConnection)
+
+# Cached as a shared resource rather than with cache_data, so reruns reuse the
+# same frame and index instead of unpickling a copy; callers must treat it as read-only
+@st.cache_resource(ttl="10m")
 def load_data():
-    """Connects to the Google Sheet securely using Streamlit Secrets and retrieves the data."""
+    """Loads the sheet data (snapshot first, then Google Sheets via Streamlit Secrets) and indexes it."""
     try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        df = conn.read(worksheet=SHEET_WORKSHEET_NAME)
+        df = read_snapshot()
+        if df is None:
+            df = get_connection().read(worksheet=SHEET_WORKSHEET_NAME)
         
         # Standardize column headers for reliable access
         df.columns = [col.upper() for col in df.columns]
         
-        # Rename the assumed blueprint column if needed
-        if df.columns[0] == df.columns[0]:
-            df.rename(columns={df.columns[0]: 'BLUEPRINT'}, inplace=True)
-            
+        # The first column is assumed to hold the blueprint names
+        df.rename(columns={df.columns[0]: 'BLUEPRINT'}, inplace=True)
+        
         # Remove rows where the blueprint name is empty
         df.dropna(subset=['BLUEPRINT'], inplace=True)
         
+        # Drop columns with no values at all (blank sheet columns come back as 'UNNAMED: N')
+        df.dropna(axis=1, how='all', inplace=True)
+        
         # --- FINAL FIX: Replace all NaN (Not a Number) values with an empty string ---
         df.fillna('', inplace=True)
         # ---------------------------------------------------------------------------
         
-        return df
+        # Lowercase the names on an Arrow-backed string Series (Arrow's utf8_lower kernel)
+        # before storing them as a categorical: one small integer code per row plus a
+        # single copy of each distinct name
+        blueprint_str = df['BLUEPRINT'].astype('string[pyarrow]')
+        blueprint_lc = blueprint_str.str.lower()
+        df['BLUEPRINT'] = blueprint_str.astype('category')
+        
+        # Shrink the remaining columns: downcast whole-number columns and store
+        # repetitive text columns as categoricals as well. Only all-string columns
+        # are categorized; numeric columns with blanks mix floats and '' after the
+        # fillna above, and mixed-type categories cannot be converted to Arrow
+        for col in df.columns.drop('BLUEPRINT'):
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            elif pd.api.types.infer_dtype(df[col]) == 'string' and df[col].nunique() <= len(df) // 2:
+                df[col] = df[col].astype('category')
+        
+        # Index row positions by lowercase blueprint name for O(1) lookups
+        idx_map = df.groupby(blueprint_lc).indices
+        
+        # Unique names sorted case-insensitively for the select box, built once per
+        # cache fill, plus a sorted lowercase copy for prefix and substring search
+        unique_names = sorted(df['BLUEPRINT'].cat.categories.tolist(), key=str.lower)
+        blueprint_names = np.array(unique_names, dtype=str)
+        blueprint_names_lc = np.char.lower(blueprint_names)
+        
+        # Rename columns for cleaner display once per cache fill (BLUEPRINT -> Blueprint)
+        df.columns = [col.replace('_', ' ').title() for col in df.columns]
+        
+        return df, idx_map, blueprint_names, blueprint_names_lc
         
     except Exception as e:
         # Generic error handling for deployment issues
-        return pd.DataFrame() 
+        return pd.DataFrame(), {}, np.array([], dtype=str), np.array([], dtype=str)
 
 
-def get_blueprint_details(blueprint_name: str, df: pd.DataFrame) -> pd.DataFrame:
+def get_blueprint_details(blueprint_name: str, df: pd.DataFrame, idx_map: Dict) -> pd.DataFrame:
     """Performs a case-insensitive lookup and returns ALL matching rows."""
-    if 'BLUEPRINT' not in df.columns:
+    if 'Blueprint' not in df.columns:
         return pd.DataFrame()
         
-    # Case-insensitive search
-    matching_rows = df[df['BLUEPRINT'].str.lower() == blueprint_name.lower()].copy()
+    # Case-insensitive search via the precomputed name -> row positions index;
+    # column labels are already display-ready from load_data
+    rows = idx_map.get(blueprint_name.lower())
+    return df.iloc[rows] if rows is not None else df.iloc[0:0]
+
+def filter_blueprint_names(search_term: str, names: np.ndarray, names_lc: np.ndarray, limit: int) -> Tuple[np.ndarray, Optional[int]]:
+    """Returns up to `limit` names containing the search term (names starting with it first)
+    and the total match count, or None for the count when the prefix matches alone fill `limit`."""
+    query = search_term.lower()
+    if not query:
+        return names[:limit], len(names)
     
-    # Rename columns for cleaner display
-    matching_rows.columns = [col.replace('_', ' ').title() for col in matching_rows.columns]
+    # Prefix search: names_lc is sorted, so all prefix matches form one contiguous slice
+    lo = np.searchsorted(names_lc, query, side='left')
+    hi = np.searchsorted(names_lc, query + '\U0010ffff', side='left')
     
-    return matching_rows
-
-# --- Streamlit Application Main Function ---
-def blueprint_app():
-    # Title will now span the full width
-    st.title("Arc Raiders Blueprint Tracker")
-    st.markdown("Click the selection box and start typing to filter and select a blueprint.")
-
-    # 1. Load data from the sheet
-    df = load_data()
+    # Enough prefix matches: skip the O(N) substring scan entirely (O(log N + limit))
+    if hi - lo >= limit:
+        return names[lo:lo + limit], None
+    
+    # Otherwise fill up with the remaining substring matches, excluding the prefix slice
+    substring_mask = np.char.find(names_lc, query) >= 0
+    substring_mask[lo:hi] = False
+    matches = np.concatenate([names[lo:hi], names[substring_mask]])
+    return matches[:limit], len(matches)
+
+@st.fragment
+def blueprint_panel(df: pd.DataFrame, idx_map: Dict, blueprint_names: np.ndarray, blueprint_names_lc: np.ndarray):
+    """Search box, blueprint selection and results; widget changes here rerun only this fragment."""
+    # 2. Search box to narrow the blueprint names (precomputed in load_data)
+    # The input only commits on Enter or focus loss, so it doesn't rerun per keystroke
+    search_term = st.text_input(
+        "Search Blueprint:",
+        key='blueprint_search',
+        label_visibility='collapsed',
+        placeholder='Type to search blueprints...'
+    ).strip()
+    
+    # Only hand the first matches to the select box to keep the dropdown small
+    matches, total_matches = filter_blueprint_names(
+        search_term, blueprint_names, blueprint_names_lc, MAX_SELECT_OPTIONS
+    )
+    filtered_options = matches.tolist()
+    if total_matches is None:
+        st.caption(f"Showing first {MAX_SELECT_OPTIONS} of {MAX_SELECT_OPTIONS}+ matches. Keep typing to narrow the list.")
+    elif total_matches > MAX_SELECT_OPTIONS:
+        st.caption(f"Showing first {MAX_SELECT_OPTIONS} of {total_matches} matches. Keep typing to narrow the list.")
     
-    if df.empty:
-        st.error("Error loading data from Google Sheets. Please check your secrets and sharing permissions.")
-        return
-
-    # 2. Extract unique blueprint names
     # Start with an empty string as the placeholder for the input box
-    all_blueprint_options = [''] + sorted(df['BLUEPRINT'].unique().tolist())
+    all_blueprint_options = [''] + filtered_options
     
     # 3. CONSOLIDATED INPUT/SELECT BOX
     blueprint_selection = st.selectbox(
@@ -84,81 +180,39 @@ def blueprint_app():
     # Only run the display logic if a valid blueprint is selected (i.e., not the empty string)
     if blueprint_selection:
         
-        details_df = get_blueprint_details(blueprint_selection, df)
+        details_df = get_blueprint_details(blueprint_selection, df, idx_map)
         
         if not details_df.empty:
             st.subheader(f"All Known Locations for: {blueprint_selection}")
             
-            # --- FINAL DATA DISPLAY CONFIGURATION (Using Raw HTML/CSS as requested) ---
-            st.markdown(
-                """
-                <style>
-                .centered-table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    font-size: 15px;
-                }
-
-                .centered-table th,
-                .centered-table td {
-                    /* Alignment for shorter columns */
-                    text-align: center !important; 
-                    padding: 10px 12px;
-                    white-space: normal;
-                    word-wrap: break-word;
-                }
-
-                /* Sticky header */
-                .centered-table th {
-                    position: sticky;
-                    top: 0;
-                    font-weight: 600;
-                    z-index: 2;
-                    background-color: rgba(30, 30, 30, 0.95);
-                }
-
-                /* Hover effect */
-                .centered-table tr:hover {
-                    background-color: rgba(255, 255, 255, 0.06);
-                }
-
-                /* Text colors per column - rely on column index */
-                .centered-table th:nth-child(2),
-                .centered-table td:nth-child(2) { color: purple; }
-
-                .centered-table th:nth-child(3),
-                .centered-table td:nth-child(3) { color: red; }
-
-                .centered-table th:nth-child(4),
-                .centered-table td:nth-child(4) { color: grey; }
-
-                .centered-table th:nth-child(5),
-                .centered-table td:nth-child(5) { color: green; }
-
-                .centered-table th:nth-child(6),
-                .centered-table td:nth-child(6) { color: blue; }
-
-                .centered-table th:nth-child(7),
-                .centered-table td:nth-child(7) { color: orange; }
-                </style>
-                """,
-                unsafe_allow_html=True
-            )
-
-            # Output the DataFrame as an HTML table with the custom CSS class
-            st.markdown(
-                details_df.to_html(
-                    index=True,
-                    classes="centered-table",
-                    escape=False
-                ),
-                unsafe_allow_html=True
-            )
+            # --- FINAL DATA DISPLAY CONFIGURATION (Arrow-backed st.dataframe grid) ---
+            # Text colors per column - rely on column position
+            styled_df = details_df.style
+            for col, color in zip(details_df.columns, COLUMN_COLORS):
+                styled_df = styled_df.set_properties(subset=[col], color=color)
+
+            st.dataframe(styled_df)
 
             # --- END FINAL DATA DISPLAY CONFIGURATION ---
             st.success(f"Found {len(details_df)} different records for this blueprint.")
         else:
             st.error(f"Blueprint **'{blueprint_selection}'** not found in the data.")
 
+# --- Streamlit Application Main Function ---
+def blueprint_app():
+    # Title will now span the full width
+    st.title("Arc Raiders Blueprint Tracker")
+    st.markdown("Type in the search box to filter, then pick a blueprint from the selection box.")
+
+    # 1. Load data from the sheet
+    df, idx_map, blueprint_names, blueprint_names_lc = load_data()
+    
+    if df.empty:
+        st.error("Error loading data from Google Sheets. Please check your secrets and sharing permissions.")
+        return
+
+    # 2-4. Search, selection and results rerun on their own as a fragment
+    blueprint_panel(df, idx_map, blueprint_names, blueprint_names_lc)
+
 if __name__ == "__main__":
     blueprint_app()
\ No newline at end of file